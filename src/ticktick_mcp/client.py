@@ -1,5 +1,7 @@
+import functools
 import logging
 import sys
+import threading
 from typing import Optional
 
 # TickTick library imports
@@ -86,61 +88,58 @@ def setup_auth():
         return False
 
 
+# Serializes the one-time client construction; see get_ticktick_client()
+_client_init_lock = threading.Lock()
+
+@functools.cache
+def _create_ticktick_client() -> Optional[TickTickClient]:
+    """Runs the OAuth2 + TickTickClient setup. Cached, so it executes at most once per process."""
+    if not all([CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, USERNAME, PASSWORD]):
+        logging.error("TickTick credentials not found in environment variables (checked in config.py). Ensure .env file is correct.")
+        return None
+
+    try:
+        logging.info(f"Initializing OAuth2 with cache path: {dotenv_dir_path / '.token-oauth'}")
+        auth_client = MCPFriendlyOAuth2(
+            client_id=CLIENT_ID,
+            client_secret=CLIENT_SECRET,
+            redirect_uri=REDIRECT_URI,
+            cache_path=dotenv_dir_path / ".token-oauth" # Use path from config
+        )
+        # The OAuth2 constructor already calls get_access_token(), so if we get here, it worked
+
+        logging.info(f"Initializing TickTickClient with username: {USERNAME}")
+        client = TickTickClient(USERNAME, PASSWORD, auth_client)
+        logging.info(f"TickTick client initialized successfully.")
+        return client
+    except Exception as e:
+        # The failure is cached as well, so initialization is not re-attempted
+        logging.error(f"Error initializing TickTick client: {e}", exc_info=True)
+        return None
+
+@functools.cache
+def get_ticktick_client() -> Optional[TickTickClient]:
+    """Returns the process-wide TickTick client, creating it on first use.
+
+    Once populated, the cache answers every call with a single lookup and no locking.
+    functools.cache can run this body concurrently while the cache is still cold, so
+    construction goes through the lock and _create_ticktick_client's own cache to
+    guarantee the OAuth2 exchange happens only once.
+    """
+    with _client_init_lock:
+        return _create_ticktick_client()
+
+
 class TickTickClientSingleton:
-    """Singleton class to manage the TickTickClient instance."""
-    _instance: Optional[TickTickClient] = None
-    _initialized: bool = False
-
-    def __new__(cls):
-        # Standard singleton pattern: __new__ controls object creation
-        if cls._instance is None:
-            # Only create the instance if it doesn't exist
-            # But defer actual client initialization to __init__
-            # to ensure it happens only once even if __new__ is called multiple times
-            # before __init__ completes (though unlikely in typical singleton usage).
-            pass # Object creation handled by Python automatically
-        return super(TickTickClientSingleton, cls).__new__(cls) # Return the instance (or create if needed)
-
-    def __init__(self):
-        """Initializes the TickTick client within the singleton instance, ensuring it runs only once."""
-        if self._initialized:
-            return # Already initialized
-
-        if not all([CLIENT_ID, CLIENT_SECRET, REDIRECT_URI, USERNAME, PASSWORD]):
-            logging.error("TickTick credentials not found in environment variables (checked in config.py). Ensure .env file is correct.")
-            TickTickClientSingleton._instance = None # Ensure instance is None if creds are missing
-            TickTickClientSingleton._initialized = True # Mark as initialized (attempted)
-            return
-
-        try:
-            logging.info(f"Initializing OAuth2 with cache path: {dotenv_dir_path / '.token-oauth'}")
-            auth_client = MCPFriendlyOAuth2(
-                client_id=CLIENT_ID,
-                client_secret=CLIENT_SECRET,
-                redirect_uri=REDIRECT_URI,
-                cache_path=dotenv_dir_path / ".token-oauth" # Use path from config
-            )
-            # The OAuth2 constructor already calls get_access_token(), so if we get here, it worked
-
-            logging.info(f"Initializing TickTickClient with username: {USERNAME}")
-            client = TickTickClient(USERNAME, PASSWORD, auth_client)
-            logging.info(f"TickTick client initialized successfully within singleton.")
-            TickTickClientSingleton._instance = client
-        except Exception as e:
-            logging.error(f"Error initializing TickTick client within singleton: {e}", exc_info=True)
-            TickTickClientSingleton._instance = None # Ensure instance is None on error
-        finally:
-            # Mark as initialized regardless of success/failure to prevent re-attempts
-            TickTickClientSingleton._initialized = True
+    """Backwards-compatible accessor for the shared TickTickClient instance."""
 
     @classmethod
     def get_client(cls) -> Optional[TickTickClient]:
         """Returns the initialized TickTick client instance."""
-        if not cls._initialized:
-            cls() # Ensure __init__ is called if not already initialized
-        if cls._instance is None:
+        client = get_ticktick_client()
+        if client is None:
             logging.warning("get_client() called, but TickTick client failed to initialize.")
-        return cls._instance
+        return client
 
 # Removed the old function
 # def initialize_ticktick_client():
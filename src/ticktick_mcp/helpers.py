@@ -1,31 +1,74 @@
+import asyncio
+import atexit
+import concurrent.futures
 import datetime
 import functools
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from .client import TickTickClientSingleton
 
+# orjson is the fast path; fall back to the stdlib encoder if it is unavailable
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 TaskObject = Dict[str, Any]
 
 # Define the ToolLogicError exception
 class ToolLogicError(Exception):
     pass
 
+# Set TICKTICK_MCP_PRETTY=1 to indent responses (useful for debugging).
+# Compact output is the default: it is smaller and lets the stdlib encoder use its C fast path.
+_PRETTY = os.environ.get("TICKTICK_MCP_PRETTY") == "1"
+
+# Cached orjson option flags (non-str keys are stringified like the stdlib encoder does).
+# orjson encodes datetime/date/time/UUID natively in ISO form, so _json_default only sees exotic types.
+_ORJSON_OPTS = (orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if _PRETTY else 0)) if orjson else 0
+# Stdlib equivalent of the orjson settings; ensure_ascii=False matches orjson's raw UTF-8 output
+_JSON_KWARGS: Dict[str, Any] = {"ensure_ascii": False, **({"indent": 2} if _PRETTY else {"separators": (",", ":")})}
+
+def _json_default(obj: Any) -> Any:
+    """Fallback for values JSON can't encode: ISO-8601 for dates/times (matching orjson), str() otherwise."""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    return str(obj)
+
+# Fixed payloads, serialized once at import
+_NULL_RESPONSE = "null"
+_NOT_INIT_RESPONSE = json.dumps({"error": "TickTick client not initialized. Please check credentials and restart."})
+
 # --- Helper Function --- #
+# Returns str rather than bytes: FastMCP wraps tool results in str TextContent and the transport does the encoding.
+# Streaming isn't possible either: each tool result is sent whole, as a single JSON-RPC message.
 def format_response(result: Any) -> str:
     """Formats the result from ticktick-py into a JSON string for MCP."""
-    if isinstance(result, (dict, list)):
+    # Exact-type checks short-circuit the common case; isinstance still admits subclasses
+    result_type = type(result)
+    if result_type is dict or result_type is list or isinstance(result, (dict, list)):
+        if orjson is not None:
+            try:
+                return orjson.dumps(result, option=_ORJSON_OPTS, default=_json_default).decode("utf-8")
+            except TypeError: # orjson.JSONEncodeError is a TypeError subclass
+                # orjson is stricter than json (e.g. ints beyond 64 bits); retry with the stdlib encoder
+                pass
         try:
-            return json.dumps(result, indent=2, default=str)
-        except TypeError as e:
-            logging.error(f"Failed to serialize response object: {e} - Object: {result}", exc_info=True)
-            return json.dumps({"error": "Failed to serialize response", "details": str(e)})
+            return json.dumps(result, default=_json_default, **_JSON_KWARGS)
+        except (TypeError, ValueError) as e:
+            logging.error("Failed to serialize response object: %s - Object: %s", e, result, exc_info=True)
+            # Only the message string needs encoding; the envelope is a fixed template
+            return f'{{"error": "Failed to serialize response", "details": {json.dumps(str(e))}}}'
     elif result is None:
-         return json.dumps(None)
+         return _NULL_RESPONSE
     else:
-        logging.warning(f"Formatting unexpected type: {type(result)} - Value: {result}")
-        return json.dumps({"result": str(result)})
+        logging.warning("Formatting unexpected type: %s - Value: %s", type(result), result)
+        return f'{{"result": {json.dumps(str(result))}}}'
 
 # --- Decorator for Client Check --- #
 def require_ticktick_client(func):
@@ -39,65 +82,180 @@ def require_ticktick_client(func):
             # Consider how to communicate this back to the MCP framework/user
             # Maybe raise a specific exception or return an error structure
             # For now, returning an error message in a dict format similar to tool outputs
-            return json.dumps({"error": "TickTick client not initialized. Please check credentials and restart."})
+            return _NOT_INIT_RESPONSE
         # If client exists, proceed with the original function call
         # Original function will now get the client via TickTickClientSingleton.get_client() itself
         return await func(*args, **kwargs)
     return wrapper
 
 # --- Internal Helper to Get All Tasks --- #
-def _get_all_tasks_from_ticktick() -> List[TaskObject]:
-    """Internal helper to fetch all *uncompleted* tasks from all projects."""
-    if not TickTickClientSingleton.get_client():
-        logging.error("_get_all_tasks_from_ticktick called when client is not initialized.")
+# Upper bound on concurrent per-project requests, to stay clear of TickTick's rate limiter
+_MAX_CONCURRENT_FETCHES = 16
+# Shared worker pool for blocking ticktick-py calls; its size also caps request concurrency
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_FETCHES, thread_name_prefix="ticktick")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+_SYNC_LOCK = threading.Lock()
+
+def _locked_sync(client: Any) -> Dict[str, Any]:
+    """Calls client.sync() under _SYNC_LOCK so two syncs never rewrite client.state at once.
+
+    Returns a shallow copy of client.state taken under the lock, i.e. the result of this sync
+    even if another sync replaces the state before the caller reads it.
+    """
+    with _SYNC_LOCK:
+        client.sync()
+        return dict(client.state)
+
+async def _sync_client(client: Any) -> Dict[str, Any]:
+    """Runs the blocking client.sync() on the shared executor so the event loop stays free."""
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, _locked_sync, client)
+
+# Seconds a fetched task list is reused before hitting the API again
+_ALL_TASKS_CACHE_TTL = 30.0
+# (tasks, expires_at) from the last successful fetch, or None
+_all_tasks_cache: Optional[Tuple[List[TaskObject], float]] = None
+# Bumped on every invalidation; a fetch only populates the cache if this is unchanged since it started
+_all_tasks_generation = 0
+# (generation, task) for the fetch currently in flight, shared by concurrent cold callers
+_all_tasks_inflight: Optional[Tuple[int, "asyncio.Task[List[TaskObject]]"]] = None
+
+def _invalidate_all_tasks_cache() -> None:
+    """Drops the cached task list. Call after any tool that mutates tasks.
+
+    Also stops an in-flight fetch (which may predate the mutation) from being cached
+    or joined by later callers.
+    """
+    global _all_tasks_cache, _all_tasks_generation
+    _all_tasks_cache = None
+    _all_tasks_generation += 1
+
+async def _get_all_tasks_from_ticktick() -> List[TaskObject]:
+    """Returns all *uncompleted* tasks, reusing the last fetch for up to _ALL_TASKS_CACHE_TTL seconds."""
+    global _all_tasks_inflight
+    if _all_tasks_cache is not None:
+        tasks, expires_at = _all_tasks_cache
+        if time.monotonic() < expires_at:
+            logging.debug("Returning %d cached uncompleted tasks.", len(tasks))
+            return list(tasks)
+
+    # Join a fetch started in the current generation, otherwise start a new one
+    if _all_tasks_inflight is not None and _all_tasks_inflight[0] == _all_tasks_generation:
+        fetch = _all_tasks_inflight[1]
+    else:
+        fetch = asyncio.ensure_future(_fetch_and_cache_all_tasks(_all_tasks_generation))
+        _all_tasks_inflight = (_all_tasks_generation, fetch)
+    # shield: a cancelled caller must not cancel the fetch other callers are waiting on
+    tasks = await asyncio.shield(fetch)
+    return list(tasks)
+
+async def _fetch_and_cache_all_tasks(generation: int) -> List[TaskObject]:
+    """Fetches all tasks and caches them, unless the cache was invalidated while fetching."""
+    global _all_tasks_cache, _all_tasks_inflight
+    try:
+        tasks = await _fetch_all_tasks_from_ticktick()
+        if generation == _all_tasks_generation:
+            _all_tasks_cache = (tasks, time.monotonic() + _ALL_TASKS_CACHE_TTL)
+        else:
+            logging.debug("Task cache invalidated during fetch; not caching the result.")
+        return tasks
+    finally:
+        if _all_tasks_inflight is not None and _all_tasks_inflight[1] is asyncio.current_task():
+            _all_tasks_inflight = None
+
+def _index_tasks_by_id(all_tasks: Dict[str, TaskObject], tasks: List[TaskObject]) -> None:
+    """Adds tasks to all_tasks keyed by id; the same task can come back from more than one view."""
+    for task in tasks:
+        task_id = task.get('id')
+        if task_id:
+            all_tasks[task_id] = task
+
+async def _fetch_all_tasks_from_ticktick() -> List[TaskObject]:
+    """Internal helper to fetch all *uncompleted* tasks, preferring a single batch sync."""
+    client = TickTickClientSingleton.get_client()
+    if not client:
+        logging.error("_fetch_all_tasks_from_ticktick called when client is not initialized.")
         raise ConnectionError("TickTick client not initialized.")
 
-    all_tasks = []
     try:
-        projects_state = TickTickClientSingleton.get_client().state.get('projects', [])
+        # sync() calls TickTick's batch/check endpoint once and refreshes client.state,
+        # which then holds every uncompleted task across all projects
+        synced_tasks = (await _sync_client(client))['tasks']
+        if not isinstance(synced_tasks, list):
+            raise TypeError(f"unexpected type for synced tasks: {type(synced_tasks)}")
+    except Exception as e:
+        logging.warning("Batch sync failed, falling back to per-project fetches: %s", e)
+        return await _fetch_tasks_per_project(client)
+
+    all_tasks: Dict[str, TaskObject] = {}
+    _index_tasks_by_id(all_tasks, synced_tasks)
+    logging.info("Found %d total uncompleted tasks.", len(all_tasks))
+    return list(all_tasks.values())
+
+async def _fetch_tasks_per_project(client: Any) -> List[TaskObject]:
+    """Fetches *uncompleted* tasks project by project (one request per project)."""
+    # Bind once; the per-project fetches below reuse these
+    get_from_project = client.task.get_from_project
+
+    all_tasks: Dict[str, TaskObject] = {}
+    try:
+        projects_state = client.state.get('projects', [])
     except Exception as e:
         logging.error(f"Error accessing client state for projects: {e}", exc_info=True)
         projects_state = []
-
-    # Get unique project IDs from state, add inbox ID
-    project_ids = {p.get('id') for p in projects_state if p.get('id')}
     try:
-        if TickTickClientSingleton.get_client().inbox_id:
-            project_ids.add(TickTickClientSingleton.get_client().inbox_id)
+        inbox_id = client.inbox_id
     except Exception as e:
         logging.error(f"Error accessing client inbox_id: {e}", exc_info=True)
+        inbox_id = None
 
-    logging.debug(f"Fetching uncompleted tasks from {len(project_ids)} projects...")
-    for project_id in project_ids:
-        try:
-            # get_from_project fetches *uncompleted* tasks for a project
-            tasks_in_project = TickTickClientSingleton.get_client().task.get_from_project(project_id)
-            if tasks_in_project:
-                 if isinstance(tasks_in_project, list):
-                     all_tasks.extend(tasks_in_project)
-                 elif isinstance(tasks_in_project, dict):
-                     all_tasks.append(tasks_in_project)
-                 else:
-                    logging.warning(f"Unexpected data type received from get_from_project for {project_id}: {type(tasks_in_project)}")
-        except Exception as e:
-            logging.warning(f"Failed to get tasks for project {project_id}: {e}")
-
-    logging.info(f"Found {len(all_tasks)} total uncompleted tasks.")
-    return all_tasks
+    # Get unique project IDs from state, add inbox ID
+    project_ids = {pid for pid in (p.get('id') for p in projects_state) if pid}
+    if inbox_id:
+        project_ids.add(inbox_id)
+
+    logging.debug("Fetching uncompleted tasks from %d projects...", len(project_ids))
+    loop = asyncio.get_running_loop()
+    project_ids = list(project_ids)
+    # get_from_project is a blocking HTTP call that fetches *uncompleted* tasks for a project
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_EXECUTOR, get_from_project, pid) for pid in project_ids),
+        return_exceptions=True
+    )
+    for project_id, tasks_in_project in zip(project_ids, results):
+        if isinstance(tasks_in_project, Exception):
+            logging.warning("Failed to get tasks for project %s: %s", project_id, tasks_in_project)
+        elif tasks_in_project:
+             if isinstance(tasks_in_project, dict):
+                 tasks_in_project = [tasks_in_project]
+             if isinstance(tasks_in_project, list):
+                 _index_tasks_by_id(all_tasks, tasks_in_project)
+             else:
+                logging.warning("Unexpected data type received from get_from_project for %s: %s", project_id, type(tasks_in_project))
+
+    logging.info("Found %d total uncompleted tasks.", len(all_tasks))
+    return list(all_tasks.values())
 
 # --- Helper for Due Date Parsing --- #
 def _parse_due_date(due_date_str: Optional[str]) -> Optional[datetime.date]:
     """Parses TickTick's dueDate string (e.g., '2024-07-27T...') into a date object."""
     if not due_date_str or not isinstance(due_date_str, str):
         return None
+    if len(due_date_str) < 10:
+        logging.warning("dueDate string too short to parse: %s", due_date_str)
+        return None
+    return _parse_due_date_cached(due_date_str)
+
+@functools.lru_cache(maxsize=8192)
+def _parse_due_date_cached(due_date_str: str) -> Optional[datetime.date]:
+    """Memoized parse of a dueDate string already known to be at least 10 characters long."""
     try:
-        # Extract YYYY-MM-DD part.
-        if len(due_date_str) >= 10:
-            date_part = due_date_str[:10]
-            return datetime.datetime.strptime(date_part, "%Y-%m-%d").date()
-        else:
-            logging.warning(f"dueDate string too short to parse: {due_date_str}")
-            return None
-    except (ValueError, TypeError) as e:
-        logging.warning(f"Could not parse dueDate string '{due_date_str}': {e}")
-        return None 
\ No newline at end of file
+        # Slice YYYY-MM-DD directly; strptime re-interprets its format string on every call
+        # int() alone would accept signs, spaces, underscores and non-ASCII digits
+        year, month, day = due_date_str[0:4], due_date_str[5:7], due_date_str[8:10]
+        if (due_date_str[4] != '-' or due_date_str[7] != '-' or not due_date_str[:10].isascii()
+                or not (year.isdigit() and month.isdigit() and day.isdigit())):
+            raise ValueError("expected YYYY-MM-DD prefix")
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError as e:
+        logging.warning("Could not parse dueDate string '%s': %s", due_date_str, e)
+        return None
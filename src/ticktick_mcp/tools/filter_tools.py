@@ -71,11 +71,11 @@ class PeriodFilter(BaseModel):
         compare_start_date = self.start_date.date() if self.start_date else None
         compare_end_date = self.end_date.date() if self.end_date else None
 
-        logging.info(f"Comparing task date {compare_task_date} with start date {compare_start_date} and end date {compare_end_date}")
+        logging.debug("Comparing task date %s with start date %s and end date %s", compare_task_date, compare_start_date, compare_end_date)
         if compare_start_date and compare_task_date < compare_start_date:
             return False
 
-        logging.info(f"Comparing task date {compare_task_date} with end date {compare_end_date}")
+        logging.debug("Comparing task date %s with end date %s", compare_task_date, compare_end_date)
         if compare_end_date and compare_task_date > compare_end_date:
             return False
 
@@ -238,7 +238,7 @@ class TaskFilterer:
 
         else: # status == 'uncompleted'
             # Fetch all uncompleted tasks; filtering happens later
-            tasks = _get_all_tasks_from_ticktick()
+            tasks = await _get_all_tasks_from_ticktick()
             logging.debug(f"Retrieved {len(tasks)} uncompleted tasks")
             return tasks
 
@@ -10,7 +10,10 @@ from ..mcp_instance import mcp
 # Import the singleton class
 from ..client import TickTickClientSingleton
 # Import helpers
-from ..helpers import format_response, require_ticktick_client, _get_all_tasks_from_ticktick, ToolLogicError
+from ..helpers import (
+    format_response, require_ticktick_client, ToolLogicError,
+    _get_all_tasks_from_ticktick, _invalidate_all_tasks_cache, _sync_client
+)
 
 # Type Hints (can be shared or moved)
 TaskId = str
@@ -219,6 +222,7 @@ async def ticktick_create_task(
             items=items
         )
         created_task = client.task.create(task_dict)
+        _invalidate_all_tasks_cache()
         logging.info(f"Successfully created task: {created_task.get('id')}")
         return format_response(created_task)
     except Exception as e:
@@ -313,6 +317,7 @@ async def update_task(
         task_obj.update(task_object)
 
         updated_task = client.task.update(task_object.model_dump(mode='json'))
+        _invalidate_all_tasks_cache()
         logging.info(f"Successfully updated task ID: {task_id}")
         return format_response(updated_task)
     except Exception as e:
@@ -411,6 +416,7 @@ async def ticktick_delete_tasks(task_ids: Union[str, List[str]]) -> str:
         delete_input = tasks_to_delete[0] if input_is_single else tasks_to_delete
 
         deleted_result = client.task.delete(delete_input)
+        _invalidate_all_tasks_cache()
 
         response_data = {
             "status": "success",
@@ -526,6 +532,7 @@ async def ticktick_complete_task(task_id: str) -> str:
             return format_response({"error": f"Task with ID {task_id} not found or invalid.", "status": "not_found"})
 
         completed_task_result = client.task.complete(task_obj)
+        _invalidate_all_tasks_cache()
 
         updated_task_obj = client.get_by_id(task_id)
         if updated_task_obj and isinstance(updated_task_obj, dict) and updated_task_obj.get('status', 0) != 0:
@@ -598,6 +605,7 @@ async def ticktick_move_task(task_id: str, new_project_id: str) -> str:
             # return format_response({"error": f"Target project with ID {new_project_id} not found or invalid.", "status": "not_found"})
 
         moved_task = client.task.move(task_obj, new_project_id)
+        _invalidate_all_tasks_cache()
         # Fetch again to confirm project ID change? API response might be sufficient.
         return format_response(moved_task)
     except Exception as e:
@@ -684,6 +692,7 @@ async def ticktick_make_subtask(parent_task_id: str, child_task_id: str) -> str:
 
         # The API call uses the child object and the parent ID string
         result_subtask = client.task.make_subtask(child_task_obj, parent_task_id)
+        _invalidate_all_tasks_cache()
 
         # Fetch parent task again to show updated subtasks/structure in the response
         updated_parent_task_obj = client.get_by_id(parent_task_id)
@@ -803,15 +812,17 @@ async def ticktick_get_all(search: str) -> str:
 
         # Get all tasks initially treats search as case-sensitive
         search_lower = search.lower()
-        client.sync()
         if search_lower == "tasks":
-            all_items = _get_all_tasks_from_ticktick()
+            # The helper syncs on its own (or serves its short-lived cache)
+            all_items = await _get_all_tasks_from_ticktick()
             return format_response(all_items)
         elif search_lower == "projects":
-            projects = [ { "id": client.inbox_id, "name": "Inbox" } ] + client.state['projects']
+            state = await _sync_client(client)
+            projects = [ { "id": client.inbox_id, "name": "Inbox" } ] + state['projects']
             return format_response(projects)
         elif search_lower == "tags":
-            all_items = client.state['tags']
+            state = await _sync_client(client)
+            all_items = state['tags']
             return format_response(all_items)
         else:
             return format_response({"error": f"Invalid search type: {search}"})
@@ -0,0 +1,9 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# ticktick_mcp.config parses sys.argv and requires a .env file when it is imported.
+# Point it at a throwaway directory so the package can be imported under pytest.
+_dotenv_dir = Path(tempfile.mkdtemp(prefix="ticktick-mcp-tests-"))
+(_dotenv_dir / ".env").write_text("TICKTICK_MCP_TESTS=1\n")
+sys.argv = [sys.argv[0], "--dotenv-dir", str(_dotenv_dir)]
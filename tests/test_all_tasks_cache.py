@@ -0,0 +1,166 @@
+import asyncio
+import threading
+
+import pytest
+
+from ticktick_mcp import helpers
+
+
+class FakeClient:
+    """Stands in for TickTickClient: sync() snapshots `server_tasks` into state['tasks']."""
+
+    def __init__(self, tasks):
+        self.server_tasks = list(tasks)
+        self.state = {'projects': [], 'tasks': []}
+        self.inbox_id = None
+        self.sync_count = 0
+        # Tests can clear `release` to hold sync() open; `started` is set once it is running
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def sync(self):
+        self.sync_count += 1
+        snapshot = list(self.server_tasks)
+        self.started.set()
+        self.release.wait(5)
+        self.state = {'projects': [], 'tasks': snapshot}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = FakeClient([{'id': 'a'}])
+    monkeypatch.setattr(helpers.TickTickClientSingleton, "get_client", lambda: fake)
+    monkeypatch.setattr(helpers, "_all_tasks_cache", None)
+    monkeypatch.setattr(helpers, "_all_tasks_inflight", None)
+    return fake
+
+
+def _ids(tasks):
+    return sorted(t['id'] for t in tasks)
+
+
+def test_cache_hit_skips_sync(client):
+    async def run():
+        first = await helpers._get_all_tasks_from_ticktick()
+        client.server_tasks.append({'id': 'b'})
+        second = await helpers._get_all_tasks_from_ticktick()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert _ids(first) == _ids(second) == ['a']
+    assert client.sync_count == 1
+
+
+def test_cache_expires_after_ttl(client, monkeypatch):
+    monkeypatch.setattr(helpers, "_ALL_TASKS_CACHE_TTL", -1.0)
+
+    async def run():
+        await helpers._get_all_tasks_from_ticktick()
+        client.server_tasks.append({'id': 'b'})
+        return await helpers._get_all_tasks_from_ticktick()
+
+    assert _ids(asyncio.run(run())) == ['a', 'b']
+    assert client.sync_count == 2
+
+
+def test_invalidate_forces_refetch(client):
+    async def run():
+        await helpers._get_all_tasks_from_ticktick()
+        client.server_tasks.append({'id': 'b'})
+        helpers._invalidate_all_tasks_cache()
+        return await helpers._get_all_tasks_from_ticktick()
+
+    assert _ids(asyncio.run(run())) == ['a', 'b']
+    assert client.sync_count == 2
+
+
+def test_concurrent_cold_calls_share_one_fetch(client):
+    async def run():
+        return await asyncio.gather(*(helpers._get_all_tasks_from_ticktick() for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert all(_ids(r) == ['a'] for r in results)
+    assert client.sync_count == 1
+
+
+def test_invalidation_during_fetch_discards_stale_result(client):
+    client.release.clear()
+
+    async def run():
+        in_flight = asyncio.ensure_future(helpers._get_all_tasks_from_ticktick())
+        await asyncio.to_thread(client.started.wait, 5)
+        # A mutating tool runs while the sync is still in flight
+        client.server_tasks.append({'id': 'b'})
+        helpers._invalidate_all_tasks_cache()
+        client.release.set()
+        stale = await in_flight
+        fresh = await helpers._get_all_tasks_from_ticktick()
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+    assert _ids(stale) == ['a']
+    assert _ids(fresh) == ['a', 'b']
+    assert client.sync_count == 2
+
+
+def test_callers_after_invalidation_do_not_join_stale_fetch(client):
+    client.release.clear()
+
+    async def run():
+        in_flight = asyncio.ensure_future(helpers._get_all_tasks_from_ticktick())
+        await asyncio.to_thread(client.started.wait, 5)
+        client.server_tasks.append({'id': 'b'})
+        helpers._invalidate_all_tasks_cache()
+        after = asyncio.ensure_future(helpers._get_all_tasks_from_ticktick())
+        await asyncio.sleep(0)
+        client.release.set()
+        return await in_flight, await after
+
+    stale, fresh = asyncio.run(run())
+    assert _ids(stale) == ['a']
+    assert _ids(fresh) == ['a', 'b']
+    assert client.sync_count == 2
+
+
+class FailingSyncClient(FakeClient):
+    """sync() fails, so the fetch falls back to one get_from_project call per project."""
+
+    def __init__(self, project_tasks):
+        super().__init__([])
+        self.project_tasks = project_tasks
+        self.state = {'projects': [{'id': pid} for pid in project_tasks if pid != 'inbox'], 'tasks': []}
+        self.inbox_id = 'inbox'
+        self.task = self
+        self.fetched = []
+
+    def sync(self):
+        self.sync_count += 1
+        raise ConnectionError("batch/check unavailable")
+
+    def get_from_project(self, project_id):
+        self.fetched.append(project_id)
+        result = self.project_tasks[project_id]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_sync_failure_falls_back_to_per_project_fetches(monkeypatch):
+    fake = FailingSyncClient({
+        'p1': [{'id': 'a'}, {'id': 'b'}],
+        'p2': {'id': 'b'}, # a single task comes back as a bare dict
+        'p3': RuntimeError("project fetch failed"),
+        'inbox': [{'id': 'a'}, {'id': 'c'}],
+    })
+    monkeypatch.setattr(helpers.TickTickClientSingleton, "get_client", lambda: fake)
+
+    tasks = asyncio.run(helpers._fetch_all_tasks_from_ticktick())
+    assert _ids(tasks) == ['a', 'b', 'c']
+    assert fake.sync_count == 1
+    assert sorted(fake.fetched) == ['inbox', 'p1', 'p2', 'p3']
+
+
+def test_batch_sync_drops_duplicate_ids(client):
+    client.server_tasks = [{'id': 'a'}, {'id': 'b'}, {'id': 'a'}, {'title': 'no id'}]
+    assert _ids(asyncio.run(helpers._fetch_all_tasks_from_ticktick())) == ['a', 'b']
@@ -0,0 +1,41 @@
+import datetime
+import json
+
+import pytest
+
+from ticktick_mcp import helpers
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    """Runs a test on both encoder paths; the stdlib one is forced by hiding orjson."""
+    if request.param == "orjson" and helpers.orjson is None:
+        pytest.skip("orjson is not installed")
+    if request.param == "stdlib":
+        monkeypatch.setattr(helpers, "orjson", None)
+    return request.param
+
+
+def test_int_beyond_64_bits_falls_back_to_stdlib():
+    big = 2 ** 70
+    assert json.loads(helpers.format_response({"n": big})) == {"n": big}
+
+
+def test_non_str_keys_match_across_encoders(monkeypatch):
+    with_orjson = helpers.format_response({1: "x"})
+    monkeypatch.setattr(helpers, "orjson", None)
+    assert helpers.format_response({1: "x"}) == with_orjson
+    assert json.loads(with_orjson) == {"1": "x"}
+
+
+def test_datetime_is_iso_8601(encoder):
+    when = datetime.datetime(2024, 7, 27, 9, 30, 15)
+    assert json.loads(helpers.format_response({"due": when})) == {"due": "2024-07-27T09:30:15"}
+
+
+def test_unencodable_key_returns_error_envelope(encoder):
+    out = helpers.format_response({(1, 2): "x"})
+    assert out.startswith('{"error": "Failed to serialize response", "details": ')
+    payload = json.loads(out)
+    assert payload["error"] == "Failed to serialize response"
+    assert payload["details"]
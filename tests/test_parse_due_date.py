@@ -0,0 +1,24 @@
+import datetime
+
+import pytest
+
+from ticktick_mcp import helpers
+
+
+def test_parses_ticktick_timestamp():
+    assert helpers._parse_due_date('2024-07-27T00:00:00.000+0000') == datetime.date(2024, 7, 27)
+
+
+@pytest.mark.parametrize("value", [
+    '2024-02-30T',     # no such day
+    '2024-7-27T00',    # unpadded month shifts the separators
+    '+024-01-01',      # int() accepts a sign
+    '２０２４-01-01',   # int() accepts non-ASCII digits
+])
+def test_rejects_malformed_dates(value):
+    assert helpers._parse_due_date(value) is None
+
+
+@pytest.mark.parametrize("value", ['2024-07', '', None, 20240727, b'2024-07-27'])
+def test_rejects_short_and_non_str_input(value):
+    assert helpers._parse_due_date(value) is None